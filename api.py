@@ -2,8 +2,11 @@ import logging
 import time
 import uuid
 
-from fastapi import FastAPI, Request
+import anyio.to_thread
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from platform_services import router
 from impl.config import settings
@@ -16,7 +19,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("xconnect.api")
 
-app = FastAPI(title=settings.app_name, version="0.1.0")
+# orjson serializes at C speed and handles datetime/UUID natively, so the big
+# list responses (repos, tables, fields) skip the stdlib json + encoder cost.
+app = FastAPI(title=settings.app_name, version="0.1.0", default_response_class=ORJSONResponse)
 
 # CORS (configure in env)
 origins = settings.cors_allow_origins_list
@@ -29,47 +34,88 @@ if origins:
         allow_headers=["*"],
     )
 
+# Repo/table/field lists easily run tens-to-hundreds of KB of JSON;
+# level 5 is the sweet spot between ratio and CPU for API payloads.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 app.include_router(router)
 
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start = time.time()
-    trace_id = request.headers.get("x-request-id") or str(uuid.uuid4())
-    request.state.trace_id = trace_id
-
-    response = None
-    try:
-        response = await call_next(request)
-        return response
-    finally:
-        duration_ms = (time.time() - start) * 1000
-        path = request.url.path
-        method = request.method
-        status_code = response.status_code if response else 500
-        client_host = request.client.host if request.client else "-"
-        route = request.scope.get("route")
-        route_name = getattr(route, "name", None) or getattr(route, "path", None) or "unknown"
-        user_id = getattr(request.state, "user_id", None)
-        path_params = request.path_params or {}
-        query_params = dict(request.query_params)
-        logger.info(
-            "trace_id=%s method=%s path=%s status=%s duration_ms=%.2f client=%s route=%s user_id=%s path_params=%s query_params=%s",
-            trace_id,
-            method,
-            path,
-            status_code,
-            duration_ms,
-            client_host,
-            route_name,
-            user_id,
-            path_params,
-            query_params,
-        )
-        if response:
-            response.headers["x-trace-id"] = trace_id
+class TraceMiddleware:
+    """Pure-ASGI request tracing.
+
+    An `@app.middleware("http")` function pays Starlette's BaseHTTPMiddleware
+    overhead (task group + response streaming wrapper) on every request.
+    Operating on the raw scope keeps the hot path to a header scan, one
+    perf_counter_ns pair, and a send wrapper. Outside prod every request is
+    logged at INFO as before; in prod only failures (>=400) and slow requests
+    (> settings.slow_request_ms) are logged, at WARNING.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter_ns()
+        trace_id = ""
+        for k, v in scope["headers"]:
+            if k == b"x-request-id":
+                trace_id = v.decode("latin-1")
+                break
+        if not trace_id:
+            trace_id = uuid.uuid4().hex
+
+        state = scope.setdefault("state", {})
+        state["trace_id"] = trace_id
+        trace_header = (b"x-trace-id", trace_id.encode("latin-1"))
+        status_code = 500
+
+        async def send_with_trace(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", []).append(trace_header)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            duration_ns = time.perf_counter_ns() - start
+            if settings.env != "prod":
+                log = logger.info
+            elif status_code >= 400 or duration_ns > settings.slow_request_ms * 1_000_000:
+                log = logger.warning
+            else:
+                log = None
+            if log:
+                route = scope.get("route")
+                client = scope.get("client")
+                log(
+                    "trace_id=%s method=%s path=%s status=%s duration_ms=%.2f client=%s route=%s user_id=%s path_params=%s query=%s",
+                    trace_id,
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    duration_ns / 1e6,
+                    client[0] if client else "-",
+                    getattr(route, "name", None) or getattr(route, "path", None) or "unknown",
+                    state.get("user_id"),
+                    scope.get("path_params") or {},
+                    scope.get("query_string", b"").decode("latin-1"),
+                )
+
+
+app.add_middleware(TraceMiddleware)
 
 
 @app.on_event("startup")
-def _startup() -> None:
+async def _startup() -> None:
+    # Sync endpoints run on AnyIO's default 40-token thread limiter, which
+    # becomes the concurrency ceiling for this mostly-I/O-bound API. Raise it
+    # so slow upstream calls (GitHub/ServiceNow) don't starve cheap requests.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
     init_db()
@@ -59,7 +59,9 @@ class GithubRepo(BaseModel):
     id: int
     full_name: str
     private: bool
-    html_url: HttpUrl
+    # plain str: GitHub already returns well-formed URLs, and full HttpUrl
+    # parsing on every read-model construction added nothing but cost
+    html_url: str
 
 
 class GithubRepoListResponse(BaseModel):
@@ -71,10 +73,10 @@ class GithubRepoDetails(BaseModel):
     id: int
     full_name: str
     private: bool
-    html_url: HttpUrl
+    html_url: str
     description: Optional[str] = None
     default_branch: Optional[str] = None
-    clone_url: Optional[HttpUrl] = None
+    clone_url: Optional[str] = None
     ssh_url: Optional[str] = None
     language: Optional[str] = None
     topics: Optional[List[str]] = None
@@ -243,3 +245,13 @@ class UserSettingsResponse(BaseModel):
 class UpdateUserSettingsRequest(BaseModel):
     theme: Optional[str] = None
     notifications: Optional[bool] = None
+
+
+# ---------- Schema warm-up ----------
+# HttpUrl/EmailStr/Literal fields build their pydantic-core schemas lazily on
+# first use, which taxes the first request after each worker starts. Force the
+# builds at import so cold-start cost is paid before traffic arrives.
+for _cls in list(globals().values()):
+    if isinstance(_cls, type) and issubclass(_cls, BaseModel) and _cls is not BaseModel:
+        _cls.model_rebuild(force=True)
+del _cls
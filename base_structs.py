@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+import msgspec
+
+
+# msgspec read models for the hot list endpoints. These mirror the pydantic
+# models in base_requests.py (which stay around for request validation and the
+# OpenAPI schema) but are assembled from data we already trust — our own DB
+# and upstream JSON we just parsed — so the near-zero construction cost and
+# C-speed msgspec.json.encode are pure win on big lists.
+
+
+class GithubRepoStruct(msgspec.Struct):
+    id: int = 0
+    full_name: str = ""
+    private: bool = False
+    html_url: str = ""
+
+
+class GithubRepoListStruct(msgspec.Struct):
+    ok: bool
+    repos: List[GithubRepoStruct]
+
+
+class ServiceNowTableStruct(msgspec.Struct):
+    name: str
+    label: Optional[str] = None
+
+
+class ServiceNowTableListStruct(msgspec.Struct):
+    ok: bool
+    tables: List[ServiceNowTableStruct]
+    returned: int
+
+
+class ServiceNowFieldStruct(msgspec.Struct):
+    name: str
+    label: Optional[str] = None
+    mandatory: bool = False
+    type: Optional[str] = None
+    reference: Optional[str] = None
+    max_length: Optional[int] = None
+
+
+class ServiceNowFieldListStruct(msgspec.Struct):
+    ok: bool
+    table: str
+    fields: List[ServiceNowFieldStruct]
+    returned: int
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
@@ -21,7 +22,7 @@ class Settings(BaseSettings):
     jwt_secret_key: str = "change_me_in_prod"
     jwt_access_token_expire_minutes: int = 60
 
-    secret_store: str = "sqlite"  # sqlite | aws
+    secret_store: Literal["sqlite", "aws"] = "sqlite"
     encryption_key: str = ""      # required for sqlite secret store
 
     aws_region: str = "ap-south-1"
@@ -29,15 +30,29 @@ class Settings(BaseSettings):
 
     cors_allow_origins: str = "*"
 
-    @field_validator("secret_store")
+    # pagination cap for GitHub repo listing (100 repos per page)
+    github_max_pages: int = 10
+
+    # prod request-trace logging threshold (see TraceMiddleware in api.py)
+    slow_request_ms: int = 500
+
+    # size of the AnyIO thread pool that runs sync endpoints (default 40).
+    # I/O-bound CRUD handlers tolerate far more threads than CPU work would.
+    threadpool_size: int = 120
+
+    # >0 sends PBKDF2 hashing to a process pool of that many workers so
+    # login bursts spread across cores; 0 hashes inline (fine for most
+    # deployments since OpenSSL releases the GIL during the derivation)
+    password_hash_workers: int = 0
+
+    @field_validator("secret_store", mode="before")
     @classmethod
-    def _validate_secret_store(cls, v: str) -> str:
-        v = (v or "").strip().lower()
-        if v not in ("sqlite", "aws"):
-            raise ValueError("SECRET_STORE must be 'sqlite' or 'aws'")
-        return v
+    def _normalize_secret_store(cls, v):
+        # case-insensitive env values; the Literal check itself runs in
+        # pydantic-core rather than Python
+        return v.strip().lower() if isinstance(v, str) else v
 
-    @property
+    @cached_property
     def cors_allow_origins_list(self) -> List[str]:
         s = (self.cors_allow_origins or "").strip()
         if not s:
@@ -47,4 +62,11 @@ class Settings(BaseSettings):
         return [x.strip() for x in s.split(",") if x.strip()]
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Parse env + .env once per process; repeat callers hit the cache."""
+    return Settings()
+
+
+# Back-compat alias: the rest of the codebase imports `settings` directly.
+settings = get_settings()
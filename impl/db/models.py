@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+import time
 from datetime import datetime, timezone
 from sqlalchemy import (
-    Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Text, Boolean
+    Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Text, Boolean, LargeBinary, func
 )
 from sqlalchemy.orm import declarative_base, relationship
 
 
 Base = declarative_base()
 
+_UTC = timezone.utc
+
 
 def utc_now() -> datetime:
-    return datetime.now(timezone.utc)
+    # fromtimestamp with a cached tzinfo is cheaper than datetime.now(tz),
+    # and this runs as a column default on every insert/update
+    return datetime.fromtimestamp(time.time(), _UTC)
 
 
 class User(Base):
@@ -20,7 +25,7 @@ class User(Base):
     id = Column(Integer, primary_key=True)
     email = Column(String(320), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utc_now, server_default=func.now(), nullable=False)
 
     integrations = relationship("Integration", back_populates="user", cascade="all,delete-orphan")
     mappings = relationship("Mapping", back_populates="user", cascade="all,delete-orphan")
@@ -47,8 +52,8 @@ class Integration(Base):
     last_test_ok = Column(Boolean, nullable=True)
     last_test_message = Column(Text, nullable=True)
 
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utc_now, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, server_default=func.now(), nullable=False)
 
     user = relationship("User", back_populates="integrations")
 
@@ -63,11 +68,12 @@ class Secret(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     name = Column(String(200), nullable=False)
 
-    # encrypted payload (sqlite secret store)
-    ciphertext = Column(Text, nullable=False)
+    # encrypted payload (sqlite secret store); Fernet tokens are bytes, so
+    # store them as-is instead of round-tripping through utf-8 text
+    ciphertext = Column(LargeBinary, nullable=False)
 
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utc_now, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, server_default=func.now(), nullable=False)
 
 
 class UserSetting(Base):
@@ -79,8 +85,8 @@ class UserSetting(Base):
     theme = Column(String(30), nullable=False, default="dark")
     notifications = Column(Boolean, nullable=False, default=True)
 
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utc_now, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, server_default=func.now(), nullable=False)
 
 
 class Mapping(Base):
@@ -96,6 +102,6 @@ class Mapping(Base):
     label = Column(String(100), nullable=False, default="default")
     direction = Column(String(30), nullable=False, default="bidirectional")  # github_to_servicenow | servicenow_to_github | bidirectional
     field_mapping_json = Column(Text, nullable=False, default="{}")  # stored as JSON object
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utc_now, server_default=func.now(), nullable=False)
 
     user = relationship("User", back_populates="mappings")
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session, load_only
+
+from impl.db.models import Integration
+
+# The services only ever touch these columns on a looked-up integration;
+# created_at/updated_at (and the provider/label echoed from the filter)
+# stay deferred and off the wire.
+INTEGRATION_LOAD_COLS = (
+    Integration.id,
+    Integration.secret_ref,
+    Integration.config_json,
+    Integration.last_tested_at,
+    Integration.last_test_ok,
+    Integration.last_test_message,
+)
+
+
+def get_integration(db: Session, *, user_id: int, provider: str, label: str) -> Optional[Integration]:
+    """Fetch an integration by its (user_id, provider, label) composite key.
+
+    Every service builds this exact lookup; lambda_stmt caches the compiled
+    SQL across calls (only the bound values change), and the unique
+    constraint on (user_id, provider, label) doubles as the covering index.
+    """
+    stmt = lambda_stmt(
+        lambda: select(Integration)
+        .options(load_only(*INTEGRATION_LOAD_COLS))
+        .where(
+            Integration.user_id == user_id,
+            Integration.provider == provider,
+            Integration.label == label,
+        )
+    )
+    return db.execute(stmt).scalar_one_or_none()
@@ -1,32 +1,68 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import create_engine, event, text, inspect
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from impl.config import settings
 from impl.db.models import Base
 
 
-_engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    future=True,
-)
+def _make_engine():
+    url = settings.database_url
+    if url.startswith("sqlite"):
+        # check_same_thread=False lets pooled connections move between the
+        # threadpool workers; timeout matches the busy_timeout pragma below.
+        kwargs = {"connect_args": {"check_same_thread": False, "timeout": 30}}
+        if ":memory:" in url:
+            kwargs["poolclass"] = StaticPool
+        else:
+            kwargs.update(pool_size=20, max_overflow=40)
+        # pre_ping is a wasted round-trip for a local file DB, and the larger
+        # query cache keeps every route's statements compiled across requests
+        engine = create_engine(url, pool_pre_ping=False, future=True, query_cache_size=1200, **kwargs)
+
+        @event.listens_for(engine, "connect")
+        def _sqlite_tuning(dbapi_conn, _record):
+            # WAL allows a writer alongside readers (multiple workers would
+            # otherwise serialize on the rollback journal and hit
+            # "database is locked"); the rest trims fsync and temp I/O cost.
+            cur = dbapi_conn.cursor()
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.execute("PRAGMA busy_timeout=5000")
+            cur.execute("PRAGMA temp_store=MEMORY")
+            cur.execute("PRAGMA mmap_size=268435456")
+            cur.execute("PRAGMA cache_size=-64000")
+            cur.close()
+
+        return engine
+
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        future=True,
+        pool_size=20,
+        max_overflow=40,
+        pool_recycle=1800,
+        query_cache_size=1200,
+    )
 
-SessionLocal = sessionmaker(bind=_engine, autoflush=False, autocommit=False, future=True)
 
+_engine = _make_engine()
 
-def _sqlite_add_column_if_missing(table: str, col: str, ddl: str) -> None:
-    if _engine.dialect.name != "sqlite":
-        return
+SessionLocal = sessionmaker(bind=_engine, autoflush=False, autocommit=False, future=True)
 
-    insp = inspect(_engine)
-    existing = {c["name"] for c in insp.get_columns(table)}
-    if col in existing:
-        return
 
-    with _engine.begin() as conn:
-        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {ddl}"))
+# Columns added after the initial schema; applied as best-effort ALTERs on
+# existing SQLite databases (create_all() won't add columns to old tables).
+_SQLITE_MIGRATIONS = (
+    ("integrations", "last_tested_at", "last_tested_at DATETIME"),
+    ("integrations", "last_test_ok", "last_test_ok BOOLEAN"),
+    ("integrations", "last_test_message", "last_test_message TEXT"),
+    ("mappings", "direction", "direction VARCHAR(30) NOT NULL DEFAULT 'bidirectional'"),
+    ("mappings", "field_mapping_json", "field_mapping_json TEXT NOT NULL DEFAULT '{}'"),
+)
 
 
 def init_db() -> None:
@@ -39,32 +75,34 @@ def init_db() -> None:
 
     Base.metadata.create_all(bind=_engine)
 
-    # Add integration health columns if upgrading an existing DB
-    _sqlite_add_column_if_missing(
-        "integrations",
-        "last_tested_at",
-        "last_tested_at DATETIME",
-    )
-    _sqlite_add_column_if_missing(
-        "integrations",
-        "last_test_ok",
-        "last_test_ok BOOLEAN",
-    )
-    _sqlite_add_column_if_missing(
-        "integrations",
-        "last_test_message",
-        "last_test_message TEXT",
-    )
-    _sqlite_add_column_if_missing(
-        "mappings",
-        "direction",
-        "direction VARCHAR(30) NOT NULL DEFAULT 'bidirectional'",
-    )
-    _sqlite_add_column_if_missing(
-        "mappings",
-        "field_mapping_json",
-        "field_mapping_json TEXT NOT NULL DEFAULT '{}'",
-    )
+    if _engine.dialect.name != "sqlite":
+        return
+
+    # One inspector pass per table instead of a PRAGMA round-trip per column,
+    # and all surviving ALTERs share a single transaction.
+    insp = inspect(_engine)
+    existing = {table: {c["name"] for c in insp.get_columns(table)} for table in {t for t, _, _ in _SQLITE_MIGRATIONS}}
+    pending = [(table, ddl) for table, col, ddl in _SQLITE_MIGRATIONS if col not in existing[table]]
+    if pending:
+        with _engine.begin() as conn:
+            for table, ddl in pending:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {ddl}"))
+
+    _warmup_pool()
+
+
+def _warmup_pool(count: int = 5) -> None:
+    """Pre-open a few pooled connections at startup.
+
+    Moves the connect cost (file open + PRAGMAs here; TLS/auth on a network
+    DB) out of the first requests each worker serves.
+    """
+    try:
+        conns = [_engine.connect() for _ in range(count)]
+    except Exception:
+        return  # warmup is best-effort; real requests will surface errors
+    for conn in conns:
+        conn.close()
 
 
 def get_db():
@@ -1,48 +1,116 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
-import requests
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from impl.config import settings
+from impl.integrations.http_pool import shared_session
+from impl.utils.ttl_cache import TTLCache
+
+
+# Compiled once; the Link header is parsed on every repo-list call.
+_LINK_LAST = re.compile(r'<([^>]+)>;\s*rel="last"')
+_PAGE_PARAM = re.compile(r"[?&]page=(\d+)")
+
+# Repo metadata changes on the minute scale; a short TTL turns repeated
+# lookups (mapping validation hits the same repo over and over) into dict
+# hits. Keyed by a token digest so raw PATs never appear in cache keys.
+_repo_cache = TTLCache(maxsize=1024, ttl=60)
 
 
 class GitHubClient:
     def __init__(self, token: str, base_url: str = "https://api.github.com"):
         self.token = token
         self.base_url = base_url.rstrip("/")
-        self.session = requests.Session()
+        self._token_key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+        self.session = shared_session()
         self.session.headers.update({
             "Authorization": f"Bearer {token}",
             "Accept": "application/vnd.github+json",
         })
 
-    def get_user(self) -> Dict[str, Any]:
-        r = self.session.get(f"{self.base_url}/user", timeout=20)
+    def graphql(self, query: str, variables: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        r = self.session.post(
+            f"{self.base_url}/graphql",
+            json={"query": query, "variables": variables or {}},
+            timeout=30,
+        )
         r.raise_for_status()
-        return r.json()
-
-    def list_repos(self) -> List[Dict[str, Any]]:
-        # basic pagination (up to 200 repos)
-        repos: List[Dict[str, Any]] = []
-        url = f"{self.base_url}/user/repos"
-        params = {"per_page": 100, "sort": "updated"}
-        for _ in range(2):
-            r = self.session.get(url, params=params, timeout=30)
-            r.raise_for_status()
-            repos.extend(r.json())
-            # GitHub pagination in Link header
-            link = r.headers.get("Link", "")
-            next_url = None
-            for part in link.split(","):
-                if 'rel="next"' in part:
-                    next_url = part.split(";")[0].strip().strip("<>").strip()
-            if not next_url:
-                break
-            url = next_url
-            params = None
-        return repos
+        data = r.json()
+        if data.get("errors"):
+            raise RuntimeError(f"GitHub GraphQL error: {data['errors'][0].get('message', 'unknown')}")
+        return data.get("data") or {}
+
+    def get_viewer(self) -> Dict[str, Any]:
+        # GraphQL lets us select just the two fields connect() needs, instead
+        # of the multi-KB REST /user payload; still a single round-trip that
+        # doubles as the token validity check.
+        viewer = self.graphql("query { viewer { databaseId login } }").get("viewer") or {}
+        return {"id": viewer.get("databaseId") or 0, "login": viewer.get("login") or ""}
+
+    def _fetch_repo_page(self, page: int) -> bytes:
+        r = self.session.get(
+            f"{self.base_url}/user/repos",
+            params={"per_page": 100, "sort": "updated", "page": page},
+            timeout=30,
+        )
+        r.raise_for_status()
+        return r.content
+
+    @staticmethod
+    def _last_page(link_header: str) -> int:
+        # GitHub advertises the final page in the Link header: <...?page=N>; rel="last"
+        m = _LINK_LAST.search(link_header)
+        if m:
+            p = _PAGE_PARAM.search(m.group(1))
+            if p:
+                return int(p.group(1))
+        return 1
+
+    def list_repo_pages(self, if_none_match: str | None = None) -> tuple[str, Optional[List[bytes]]]:
+        # Page 1 tells us the total page count via rel="last"; the remaining
+        # pages are independent, so fetch them in parallel instead of paying
+        # one network round-trip per page. Bodies are returned as raw bytes
+        # so callers can decode straight into typed structs in one C call
+        # per page rather than via intermediate dicts.
+        #
+        # Callers that kept the previous ETag get conditional-request
+        # semantics: a 304 on page 1 means nothing changed, we return
+        # (etag, None) and they can reuse their cached result. GitHub does
+        # not count 304s against the rate limit.
+        headers = {"If-None-Match": if_none_match} if if_none_match else None
+        first = self.session.get(
+            f"{self.base_url}/user/repos",
+            params={"per_page": 100, "sort": "updated", "page": 1},
+            headers=headers,
+            timeout=30,
+        )
+        if if_none_match and first.status_code == 304:
+            return if_none_match, None
+        first.raise_for_status()
+        pages_raw: List[bytes] = [first.content]
+
+        last = min(self._last_page(first.headers.get("Link", "")), settings.github_max_pages)
+        if last > 1:
+            pages = range(2, last + 1)
+            with ThreadPoolExecutor(max_workers=min(8, len(pages))) as pool:
+                pages_raw.extend(pool.map(self._fetch_repo_page, pages))
+        return first.headers.get("ETag", ""), pages_raw
 
     def get_repo(self, full_name: str) -> Dict[str, Any]:
         full_name = full_name.strip().rstrip("/")
+        key = (self._token_key, full_name)
+        cached = _repo_cache.get(key)
+        if cached is not None:
+            return cached
         url = f"{self.base_url}/repos/{full_name}"
         r = self.session.get(url, timeout=20)
         r.raise_for_status()
-        return r.json()
+        repo = r.json()
+        _repo_cache.set(key, repo)
+        return repo
+
+    def invalidate_repo(self, full_name: str) -> None:
+        _repo_cache.invalidate((self._token_key, full_name.strip().rstrip("/")))
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# One process-wide adapter: urllib3 keeps its connection pools (and their
+# established TCP+TLS connections) inside the adapter, so every Session
+# mounted on it reuses warm connections to api.github.com / the ServiceNow
+# instance instead of paying a fresh handshake per request.
+_adapter = HTTPAdapter(pool_connections=20, pool_maxsize=100)
+
+
+def shared_session() -> requests.Session:
+    """A new Session (per-client headers/auth) backed by the shared pool.
+
+    Sessions themselves are cheap; only the connections are shared, so
+    credentials set on one session never leak into another.
+    """
+    s = requests.Session()
+    s.mount("https://", _adapter)
+    s.mount("http://", _adapter)
+    s.headers["Accept-Encoding"] = "gzip, deflate"
+    return s
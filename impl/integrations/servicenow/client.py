@@ -1,14 +1,27 @@
 from __future__ import annotations
 
+import hashlib
 from typing import Any, Dict, List, Optional
-import requests
+
+from impl.integrations.http_pool import shared_session
+from impl.utils.ttl_cache import TTLCache
+
+
+# Table and dictionary metadata is close to static; cache it briefly so the
+# mapping/validation flows don't re-fetch it per request. Keys carry a
+# credential digest (never the raw password) so results stay per-identity.
+_table_cache = TTLCache(maxsize=256, ttl=60)
+_field_cache = TTLCache(maxsize=1024, ttl=60)
 
 
 class ServiceNowClient:
     def __init__(self, instance_url: str, username: str, password: str):
         self.instance_url = instance_url.rstrip("/")
         self.auth = (username, password)
-        self.session = requests.Session()
+        self._cred_key = hashlib.blake2b(
+            f"{self.instance_url}\n{username}\n{password}".encode("utf-8"), digest_size=16
+        ).digest()
+        self.session = shared_session()
         self.session.headers.update({"Accept": "application/json"})
 
     def _url(self, path: str) -> str:
@@ -24,6 +37,10 @@ class ServiceNowClient:
         return r.json()
 
     def list_tables(self, *, limit: int = 50, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        key = (self._cred_key, limit, query)
+        cached = _table_cache.get(key)
+        if cached is not None:
+            return cached
         url = self._url("/api/now/table/sys_db_object")
         params = {
             "sysparm_fields": "name,label",
@@ -36,9 +53,15 @@ class ServiceNowClient:
         r = self.session.get(url, params=params, auth=self.auth, timeout=30)
         r.raise_for_status()
         data = r.json() or {}
-        return data.get("result", []) or []
+        tables = data.get("result", []) or []
+        _table_cache.set(key, tables)
+        return tables
 
     def list_fields(self, *, table: str, limit: int = 500) -> List[Dict[str, Any]]:
+        key = (self._cred_key, table, limit)
+        cached = _field_cache.get(key)
+        if cached is not None:
+            return cached
         url = self._url("/api/now/table/sys_dictionary")
         params = {
             "sysparm_query": f"name={table}",
@@ -48,7 +71,9 @@ class ServiceNowClient:
         r = self.session.get(url, params=params, auth=self.auth, timeout=30)
         r.raise_for_status()
         data = r.json() or {}
-        return data.get("result", []) or []
+        fields = data.get("result", []) or []
+        _field_cache.set(key, fields)
+        return fields
 
     def create_record(self, *, table: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         url = self._url(f"/api/now/table/{table}")
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
-import json
 import boto3
 from botocore.exceptions import ClientError
 
 from impl.config import settings
-from impl.secret_store.interfaces import SecretStore
+from impl.utils.json_utils import dumps, loads
 
 
-class AWSSecretsManagerStore(SecretStore):
+class AWSSecretsManagerStore:
+    __slots__ = ("client",)
+
     def __init__(self):
         self.client = boto3.client("secretsmanager", region_name=settings.aws_region)
 
@@ -18,7 +19,7 @@ class AWSSecretsManagerStore(SecretStore):
 
     def put(self, *, user_id: int, name: str, value: str) -> str:
         secret_name = self._name(user_id, name)
-        payload = json.dumps({"value": value})
+        payload = dumps({"value": value})
         try:
             self.client.create_secret(Name=secret_name, SecretString=payload)
         except ClientError as e:
@@ -35,5 +36,5 @@ class AWSSecretsManagerStore(SecretStore):
         secret_name = ref.split(":", 1)[1]
         resp = self.client.get_secret_value(SecretId=secret_name)
         s = resp.get("SecretString") or "{}"
-        obj = json.loads(s)
+        obj = loads(s)
         return str(obj.get("value", ""))
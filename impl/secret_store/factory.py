@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 from sqlalchemy.orm import Session
 
 from impl.config import settings
@@ -8,7 +10,14 @@ from impl.secret_store.sqlite_store import SQLiteSecretStore
 from impl.secret_store.aws_store import AWSSecretsManagerStore
 
 
+@lru_cache(maxsize=1)
+def _aws_store() -> AWSSecretsManagerStore:
+    # boto3 client construction loads session/region config; build it once
+    # per process instead of on every authenticated request.
+    return AWSSecretsManagerStore()
+
+
 def get_secret_store(db: Session) -> SecretStore:
     if settings.secret_store == "aws":
-        return AWSSecretsManagerStore()
+        return _aws_store()
     return SQLiteSecretStore(db)
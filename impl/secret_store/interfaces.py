@@ -1,15 +1,19 @@
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
+from typing import Protocol
 
 
-class SecretStore(ABC):
-    @abstractmethod
+class SecretStore(Protocol):
+    """Structural interface for secret stores.
+
+    A Protocol costs nothing at runtime (no ABC subclass hooks, and the
+    implementations can use __slots__); stores just need matching put/get.
+    """
+
     def put(self, *, user_id: int, name: str, value: str) -> str:
         """Stores a secret and returns a reference string."""
-        raise NotImplementedError
+        ...
 
-    @abstractmethod
     def get(self, *, user_id: int, ref: str) -> str:
         """Fetch secret value by ref."""
-        raise NotImplementedError
+        ...
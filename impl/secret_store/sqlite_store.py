@@ -1,21 +1,27 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from functools import lru_cache
 
 from cryptography.fernet import Fernet
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from impl.config import settings
 from impl.utils.crypto_utils import get_or_create_fernet_key
-from impl.db.models import Secret
-from impl.secret_store.interfaces import SecretStore
+from impl.db.models import Secret, utc_now
 
 
-def _utc_now():
-    return datetime.now(timezone.utc)
+@lru_cache(maxsize=4)
+def _fernet_for(key: str) -> Fernet:
+    # Fernet() base64-decodes and splits the key on every construction;
+    # the store is instantiated per request, so build it once per key.
+    return Fernet(key.encode("utf-8"))
 
 
-class SQLiteSecretStore(SecretStore):
+class SQLiteSecretStore:
+    __slots__ = ("db", "fernet")
+
     def __init__(self, db: Session):
         # In prod, you should set ENCRYPTION_KEY.
         # In dev, we auto-generate a local Fernet key file so you can actually run the app.
@@ -26,26 +32,54 @@ class SQLiteSecretStore(SecretStore):
             raise RuntimeError("ENCRYPTION_KEY is required when SECRET_STORE=sqlite")
 
         self.db = db
-        self.fernet = Fernet(key.encode("utf-8"))
+        self.fernet = _fernet_for(key)
 
     def put(self, *, user_id: int, name: str, value: str) -> str:
-        ciphertext = self.fernet.encrypt(value.encode("utf-8")).decode("utf-8")
-        row = self.db.query(Secret).filter(Secret.user_id == user_id, Secret.name == name).first()
+        ciphertext = self.fernet.encrypt(value.encode("utf-8"))
+        now = utc_now()
+
+        if self.db.get_bind().dialect.name == "sqlite":
+            # Single round-trip: upsert on (user_id, name) and get the id back.
+            stmt = (
+                sqlite_insert(Secret)
+                .values(user_id=user_id, name=name, ciphertext=ciphertext, created_at=now, updated_at=now)
+                .on_conflict_do_update(
+                    index_elements=["user_id", "name"],
+                    set_={"ciphertext": ciphertext, "updated_at": now},
+                )
+                .returning(Secret.id)
+            )
+            sid = self.db.execute(stmt).scalar_one()
+            self.db.commit()
+            return f"sqlite:{sid}"
+
+        # Portable fallback for other dialects. flush() populates row.id, so
+        # there's no need for the SELECT that db.refresh() used to issue.
+        row = self.db.execute(
+            select(Secret).where(Secret.user_id == user_id, Secret.name == name)
+        ).scalar_one_or_none()
         if row:
             row.ciphertext = ciphertext
-            row.updated_at = _utc_now()
+            row.updated_at = now
         else:
-            row = Secret(user_id=user_id, name=name, ciphertext=ciphertext, created_at=_utc_now(), updated_at=_utc_now())
+            row = Secret(user_id=user_id, name=name, ciphertext=ciphertext, created_at=now, updated_at=now)
             self.db.add(row)
+        self.db.flush()
+        sid = row.id
         self.db.commit()
-        self.db.refresh(row)
-        return f"sqlite:{row.id}"
+        return f"sqlite:{sid}"
 
     def get(self, *, user_id: int, ref: str) -> str:
         if not ref.startswith("sqlite:"):
             raise ValueError("Invalid sqlite secret ref")
         sid = int(ref.split(":", 1)[1])
-        row = self.db.query(Secret).filter(Secret.id == sid, Secret.user_id == user_id).first()
+        row = self.db.execute(
+            select(Secret).where(Secret.id == sid, Secret.user_id == user_id)
+        ).scalar_one_or_none()
         if not row:
             raise ValueError("Secret not found")
-        return self.fernet.decrypt(row.ciphertext.encode("utf-8")).decode("utf-8")
\ No newline at end of file
+        data = row.ciphertext
+        if isinstance(data, str):
+            # rows written before ciphertext became a binary column
+            data = data.encode("utf-8")
+        return self.fernet.decrypt(data).decode("utf-8")
\ No newline at end of file
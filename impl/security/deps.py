@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from impl.db.session import get_db
 from impl.db.models import User
 from impl.security.jwt import decode_token
+from impl.security.token_cache import CachedUser, get_user, put_user, token_key
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
@@ -16,15 +17,25 @@ def get_current_user(
     request: Request,
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme),
-) -> User:
+) -> CachedUser:
+    # Short-TTL cache keyed by token digest: repeat requests with the same
+    # bearer token skip both the JWT verify and the user SELECT.
+    key = token_key(token)
+    cached = get_user(key)
+    if cached is not None:
+        request.state.user_id = cached.id
+        return cached
+
     try:
         payload = decode_token(token)
         user_id = int(payload.get("uid"))
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    request.state.user_id = user.id
-    return user
+    snapshot = CachedUser(id=user.id, email=user.email, created_at=user.created_at)
+    put_user(key, snapshot)
+    request.state.user_id = snapshot.id
+    return snapshot
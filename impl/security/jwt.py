@@ -1,28 +1,59 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+import base64
+import hashlib
+import hmac
+import time
 from typing import Any, Dict
 
-from jose import jwt
+import jwt
+import orjson
 
 from impl.config import settings
 
 
 ALGORITHM = "HS256"
 
+# Encoded once: HMAC takes bytes, and re-encoding the secret per call is
+# avoidable work on a path hit by every token issue/verify.
+_SECRET = settings.jwt_secret_key.encode("utf-8")
+
+# We only ever issue HS256 tokens, so the protected header is a constant;
+# pinning it byte-for-byte rejects alg-swap tokens without parsing JSON.
+_EXPECTED_HEADER = jwt.encode({}, _SECRET, algorithm=ALGORITHM).encode("ascii").split(b".", 1)[0]
+
 
 def create_access_token(*, subject: str, claims: Dict[str, Any], expires_minutes: int) -> tuple[str, int]:
-    now = datetime.now(timezone.utc)
-    exp = now + timedelta(minutes=expires_minutes)
+    # iat/exp are plain Unix seconds; time.time() skips the tz-aware datetime
+    # construction and float round-trips the old version paid twice per token
+    now_ts = int(time.time())
+    expires_in = expires_minutes * 60
     payload = {
         "sub": subject,
-        "iat": int(now.timestamp()),
-        "exp": int(exp.timestamp()),
+        "iat": now_ts,
+        "exp": now_ts + expires_in,
         **claims,
     }
-    token = jwt.encode(payload, settings.jwt_secret_key, algorithm=ALGORITHM)
-    return token, int((exp - now).total_seconds())
+    token = jwt.encode(payload, _SECRET, algorithm=ALGORITHM)
+    return token, expires_in
 
 
 def decode_token(token: str) -> Dict[str, Any]:
-    return jwt.decode(token, settings.jwt_secret_key, algorithms=[ALGORITHM])
+    # Inline verify for our own single-algorithm tokens: one split, one HMAC,
+    # one orjson parse — no per-call options dict or algorithm negotiation.
+    try:
+        header, payload_b64, sig_b64 = token.encode("ascii").split(b".")
+    except (ValueError, UnicodeEncodeError):
+        raise ValueError("Malformed token")
+    if header != _EXPECTED_HEADER:
+        raise ValueError("Unexpected token header")
+
+    mac = hmac.new(_SECRET, header + b"." + payload_b64, hashlib.sha256).digest()
+    sig = base64.urlsafe_b64decode(sig_b64 + b"==")
+    if not hmac.compare_digest(mac, sig):
+        raise ValueError("Invalid token signature")
+
+    payload = orjson.loads(base64.urlsafe_b64decode(payload_b64 + b"=="))
+    if int(payload.get("exp", 0)) < time.time():
+        raise ValueError("Token expired")
+    return payload
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from datetime import datetime
+from typing import Optional
+
+from impl.utils.ttl_cache import TTLCache
+
+
+class CachedUser:
+    """Detached snapshot of the user columns auth-guarded endpoints read.
+
+    Deliberately not an ORM object: it carries no session, so it can be
+    shared across requests without identity-map or lazy-load surprises.
+    """
+
+    __slots__ = ("id", "email", "created_at")
+
+    def __init__(self, id: int, email: str, created_at: datetime):
+        self.id = id
+        self.email = email
+        self.created_at = created_at
+
+
+# Bearer tokens repeat across consecutive requests from the same client, so a
+# short TTL turns the per-request JWT verify + user SELECT into a dict hit.
+# Keys are token digests, never raw tokens.
+_cache = TTLCache(maxsize=10000, ttl=30)
+
+# Per-user epoch counters; bumping one invalidates every cached entry for that
+# user without having to know which tokens referenced it.
+_epochs: dict[int, int] = {}
+_epochs_lock = threading.Lock()
+
+
+def token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def _current_epoch(user_id: int) -> int:
+    return _epochs.get(user_id, 0)
+
+
+def get_user(key: bytes) -> Optional[CachedUser]:
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    epoch, user = entry
+    if epoch != _current_epoch(user.id):
+        _cache.invalidate(key)
+        return None
+    return user
+
+
+def put_user(key: bytes, user: CachedUser) -> None:
+    _cache.set(key, (_current_epoch(user.id), user))
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop all cached auth entries for a user (password/email change)."""
+    with _epochs_lock:
+        _epochs[user_id] = _epochs.get(user_id, 0) + 1
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 from pathlib import Path
 
 from cryptography.fernet import Fernet
@@ -9,6 +10,7 @@ from cryptography.fernet import Fernet
 DEFAULT_LOCAL_KEY_FILE = ".xconnect_fernet_key"
 
 
+@lru_cache(maxsize=1)
 def get_or_create_fernet_key() -> str:
     """Return a base64 Fernet key.
 
@@ -18,6 +20,9 @@ def get_or_create_fernet_key() -> str:
 
     This is intentionally "dev friendly": you get encryption at rest without
     the app exploding on first run. For production, set ENCRYPTION_KEY.
+
+    The result is memoized for the life of the process, so the env/file
+    lookup happens once rather than on every encrypt/decrypt.
     """
 
     env_key = os.getenv("ENCRYPTION_KEY")
@@ -41,3 +46,8 @@ def get_or_create_fernet_key() -> str:
         return key
 
     return key
+
+
+def invalidate_fernet_key() -> None:
+    """Forget the memoized key (tests that rotate ENCRYPTION_KEY need this)."""
+    get_or_create_fernet_key.cache_clear()
@@ -1,12 +1,26 @@
 from __future__ import annotations
 
-import json
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any
+
+import orjson
 
 
 def dumps(obj: Any) -> str:
-    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    # orjson returns bytes; config_json columns are String, so decode once.
+    return orjson.dumps(obj).decode("utf-8")
+
+
+def loads(s: str | bytes | None) -> Any:
+    return orjson.loads(s or b"{}")
+
 
+@lru_cache(maxsize=4096)
+def loads_cached(s: str) -> Any:
+    """Parse-once cache for small JSON documents that repeat across requests
+    (e.g. a row's field_mapping_json served on every list call).
 
-def loads(s: str) -> Any:
-    return json.loads(s or "{}")
+    The cached object is shared — callers that hand the result to anything
+    that might mutate it should copy (``dict(loads_cached(s))``).
+    """
+    return loads(s)
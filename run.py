@@ -0,0 +1,24 @@
+"""Production entrypoint: uvloop + httptools + multiple workers.
+
+`uvicorn api:app --reload` stays the dev workflow; point containers /
+process managers at `python run.py` instead. uvloop and httptools ship
+with `uvicorn[standard]`, and the access log is disabled because our own
+middleware already traces requests.
+"""
+
+import os
+
+import uvicorn
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "api:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WEB_CONCURRENCY", "4")),
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+        proxy_headers=False,
+        log_level="warning",
+    )
@@ -1,17 +1,26 @@
 from __future__ import annotations
 
 from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from base_requests import RegisterRequest, LoginRequest, TokenResponse, ChangePasswordRequest, UpdateMeRequest, MeResponse
 from impl.config import settings
-from impl.db.session import SessionLocal
 from impl.db.models import User
 from impl.security.passwords import hash_password, verify_password
 from impl.security.jwt import create_access_token
+from impl.security.token_cache import invalidate_user
 
 
 class AuthService:
+    # the session is request-scoped and injected by the route layer, so all
+    # services in one request share a single pool checkout
+    __slots__ = ("db",)
+
+    def __init__(self, db: Session):
+        self.db = db
+
     def _issue_token(self, *, user: User) -> TokenResponse:
         token, exp = create_access_token(
             subject=str(user.id),
@@ -21,55 +30,66 @@ class AuthService:
         return TokenResponse(access_token=token, expires_in_seconds=exp)
 
     def register(self, req: RegisterRequest) -> TokenResponse:
-        with SessionLocal() as db:
-            existing = db.query(User).filter(User.email == req.email).first()
-            if existing:
-                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
-
-            user = User(email=req.email, password_hash=hash_password(req.password))
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-            return self._issue_token(user=user)
+        db = self.db
+        # single INSERT; the unique index on users.email turns duplicates
+        # into IntegrityError without a racy SELECT-then-INSERT
+        user = User(email=req.email, password_hash=hash_password(req.password))
+        db.add(user)
+        try:
+            db.flush()  # assigns user.id; created_at comes from the client-side default
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
+        # issue the token while the attributes are still loaded, so the
+        # post-commit expiry never triggers a refresh SELECT
+        token = self._issue_token(user=user)
+        db.commit()
+        return token
 
     def login(self, req: LoginRequest) -> TokenResponse:
-        with SessionLocal() as db:
-            user = self._authenticate(db, email=req.email, password=req.password)
-            return self._issue_token(user=user)
+        user = self._authenticate(email=req.email, password=req.password)
+        return self._issue_token(user=user)
 
     def login_password(self, *, email: str, password: str) -> TokenResponse:
-        with SessionLocal() as db:
-            user = self._authenticate(db, email=email, password=password)
-            return self._issue_token(user=user)
+        user = self._authenticate(email=email, password=password)
+        return self._issue_token(user=user)
 
-    def _authenticate(self, db: Session, *, email: str, password: str) -> User:
-        user = db.query(User).filter(User.email == email).first()
+    def _authenticate(self, *, email: str, password: str) -> User:
+        user = self.db.execute(select(User).where(User.email == email)).scalar_one_or_none()
         if not user or not verify_password(password, user.password_hash):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
         return user
 
     def change_password(self, *, user_id: int, req: ChangePasswordRequest) -> None:
-        with SessionLocal() as db:
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-            if not verify_password(req.current_password, user.password_hash):
-                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Current password is incorrect")
-            user.password_hash = hash_password(req.new_password)
-            db.commit()
+        db = self.db
+        user = db.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        if not verify_password(req.current_password, user.password_hash):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Current password is incorrect")
+        user.password_hash = hash_password(req.new_password)
+        db.commit()
+        invalidate_user(user_id)
 
     def update_me(self, *, user_id: int, req: UpdateMeRequest) -> MeResponse:
-        with SessionLocal() as db:
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        db = self.db
+        user = db.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-            if req.email and req.email != user.email:
-                exists = db.query(User).filter(User.email == req.email).first()
-                if exists:
-                    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already in use")
-                user.email = req.email
+        if req.email and req.email != user.email:
+            # scalar probe instead of hydrating a full User row
+            taken = db.execute(
+                select(User.id).where(User.email == req.email, User.id != user_id).limit(1)
+            ).scalar_one_or_none()
+            if taken is not None:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already in use")
+            user.email = req.email
 
-            db.commit()
-            db.refresh(user)
-            return MeResponse(id=user.id, email=user.email, created_at=user.created_at.isoformat())
+        # every field is already in memory; build the response before the
+        # commit expires attributes instead of refreshing afterwards
+        # trusted: DB source (email re-validated on input by UpdateMeRequest)
+        resp = MeResponse.model_construct(id=user.id, email=user.email, created_at=user.created_at.isoformat())
+        db.commit()
+        invalidate_user(user_id)
+        return resp
@@ -1,159 +1,169 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-
+import msgspec
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from base_requests import (
     GithubConnectRequest, GithubConnectResponse,
-    GithubRepo, GithubRepoListResponse, GithubRepoDetails, GithubRepoDetailsResponse
+    GithubRepoDetails, GithubRepoDetailsResponse
 )
-from impl.db.session import SessionLocal
-from impl.db.models import Integration
+from base_structs import GithubRepoStruct, GithubRepoListStruct
+from impl.db.models import Integration, utc_now as _utc_now
+from impl.db.queries import get_integration
 from impl.secret_store.factory import get_secret_store
 from impl.integrations.github.client import GitHubClient
 from impl.utils.json_utils import dumps
+from impl.utils.ttl_cache import TTLCache
+
+
+# Decodes a raw GitHub page body straight into structs, skipping fields we
+# don't declare, in one C call per page instead of per-repo dict plumbing.
+_repo_page_decoder = msgspec.json.Decoder(list[GithubRepoStruct])
+
+# ETag + decoded repo list per integration row. The entry is only ever used
+# after GitHub confirms it with a 304, so the TTL just bounds memory, not
+# staleness; in steady state list_repos is one conditional round-trip.
+_repo_list_cache = TTLCache(maxsize=256, ttl=600)
 
+# Successful reads only re-stamp last_tested_at after this many seconds;
+# committing on every list/detail call forced an fsync per read request.
+_BOOKKEEP_WINDOW_S = 60
 
-def _utc_now():
-    return datetime.now(timezone.utc)
+
+def _mark_test_ok(db: Session, row: Integration) -> None:
+    now = _utc_now()
+    last = row.last_tested_at
+    if row.last_test_ok and last is not None:
+        if last.tzinfo is None:  # SQLite hands back naive datetimes
+            last = last.replace(tzinfo=now.tzinfo)
+        if (now - last).total_seconds() < _BOOKKEEP_WINDOW_S:
+            return
+    row.last_tested_at = now
+    row.last_test_ok = True
+    row.last_test_message = "OK"
+    db.commit()
 
 class GithubService:
     PROVIDER = "github"
 
-    def connect(self, *, user_id: int, req: GithubConnectRequest) -> GithubConnectResponse:
-        with SessionLocal() as db:
-            # validate token first
-            try:
-                gh = GitHubClient(req.token)
-                me = gh.get_user()
-            except Exception as e:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"GitHub auth failed: {e}")
-
-            store = get_secret_store(db)
-            secret_ref = store.put(user_id=user_id, name=f"github_token:{req.label}", value=req.token)
-
-            cfg = {"type": "pat", "github_user_id": int(me.get("id", 0)), "github_login": str(me.get("login", ""))}
-            row = (
-                db.query(Integration)
-                .filter(Integration.user_id == user_id, Integration.provider == self.PROVIDER, Integration.label == req.label)
-                .first()
-            )
-            if row:
-                row.config_json = dumps(cfg)
-                row.secret_ref = secret_ref
-            else:
-                row = Integration(user_id=user_id, provider=self.PROVIDER, label=req.label, config_json=dumps(cfg), secret_ref=secret_ref)
-                db.add(row)
+    __slots__ = ("db",)
 
-            row.last_tested_at = _utc_now()
-            row.last_test_ok = True
-            row.last_test_message = "OK"
+    def __init__(self, db: Session):
+        self.db = db
 
+    def connect(self, *, user_id: int, req: GithubConnectRequest) -> GithubConnectResponse:
+        db = self.db
+        # validate token first
+        try:
+            gh = GitHubClient(req.token)
+            me = gh.get_viewer()
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"GitHub auth failed: {e}")
+
+        store = get_secret_store(db)
+        secret_ref = store.put(user_id=user_id, name=f"github_token:{req.label}", value=req.token)
+
+        cfg = {"type": "pat", "github_user_id": int(me.get("id", 0)), "github_login": str(me.get("login", ""))}
+        row = get_integration(db, user_id=user_id, provider=self.PROVIDER, label=req.label)
+        if row:
+            row.config_json = dumps(cfg)
+            row.secret_ref = secret_ref
+        else:
+            row = Integration(user_id=user_id, provider=self.PROVIDER, label=req.label, config_json=dumps(cfg), secret_ref=secret_ref)
+            db.add(row)
+
+        row.last_tested_at = _utc_now()
+        row.last_test_ok = True
+        row.last_test_message = "OK"
+
+        db.commit()
+
+        return GithubConnectResponse(
+            ok=True,
+            label=req.label,
+            github_login=str(me.get("login", "")),
+            github_user_id=int(me.get("id", 0)),
+        )
+
+    def list_repos(self, *, user_id: int, label: str = "default") -> GithubRepoListStruct:
+        db = self.db
+        row = get_integration(db, user_id=user_id, provider=self.PROVIDER, label=label)
+        if not row or not row.secret_ref:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="GitHub integration not configured")
+
+        store = get_secret_store(db)
+        token = store.get(user_id=user_id, ref=row.secret_ref)
+
+        cached = _repo_list_cache.get(row.id)
+        try:
+            gh = GitHubClient(token)
+            etag, pages_raw = gh.list_repo_pages(if_none_match=cached[0] if cached else None)
+            _mark_test_ok(db, row)
+        except Exception as e:
+            row.last_tested_at = _utc_now()
+            row.last_test_ok = False
+            row.last_test_message = str(e)[:500]
             db.commit()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"GitHub API failed: {e}")
 
-            return GithubConnectResponse(
-                ok=True,
-                label=req.label,
-                github_login=str(me.get("login", "")),
-                github_user_id=int(me.get("id", 0)),
-            )
-
-    def list_repos(self, *, user_id: int, label: str = "default") -> GithubRepoListResponse:
-        with SessionLocal() as db:
-            row = (
-                db.query(Integration)
-                .filter(Integration.user_id == user_id, Integration.provider == self.PROVIDER, Integration.label == label)
-                .first()
-            )
-            if not row or not row.secret_ref:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="GitHub integration not configured")
-
-            store = get_secret_store(db)
-            token = store.get(user_id=user_id, ref=row.secret_ref)
-
-            try:
-                gh = GitHubClient(token)
-                repos_raw = gh.list_repos()
-
-                row.last_tested_at = _utc_now()
-                row.last_test_ok = True
-                row.last_test_message = "OK"
-                db.commit()
-            except Exception as e:
-                row.last_tested_at = _utc_now()
-                row.last_test_ok = False
-                row.last_test_message = str(e)[:500]
-                db.commit()
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"GitHub API failed: {e}")
-
-            repos = [
-                GithubRepo(
-                    id=int(r.get("id", 0)),
-                    full_name=str(r.get("full_name", "")),
-                    private=bool(r.get("private", False)),
-                    html_url=str(r.get("html_url", "")),
-                )
-                for r in repos_raw
-                if r.get("full_name")
-            ]
-            return GithubRepoListResponse(ok=True, repos=repos)
+        if pages_raw is None:  # 304: nothing changed since the cached fetch
+            return GithubRepoListStruct(ok=True, repos=cached[1])
+
+        repos: list[GithubRepoStruct] = []
+        for page in pages_raw:
+            repos.extend(r for r in _repo_page_decoder.decode(page) if r.full_name)
+        if etag:
+            _repo_list_cache.set(row.id, (etag, repos))
+        return GithubRepoListStruct(ok=True, repos=repos)
 
     def get_repo_details(self, *, user_id: int, full_name: str, label: str = "default") -> GithubRepoDetailsResponse:
         repo_full_name = full_name.strip()
         if "/" not in repo_full_name:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="full_name must be like owner/repo")
 
-        with SessionLocal() as db:
-            row = (
-                db.query(Integration)
-                .filter(Integration.user_id == user_id, Integration.provider == self.PROVIDER, Integration.label == label)
-                .first()
-            )
-            if not row or not row.secret_ref:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="GitHub integration not configured")
-
-            store = get_secret_store(db)
-            token = store.get(user_id=user_id, ref=row.secret_ref)
-
-            try:
-                gh = GitHubClient(token)
-                repo_raw = gh.get_repo(repo_full_name)
-
-                row.last_tested_at = _utc_now()
-                row.last_test_ok = True
-                row.last_test_message = "OK"
-                db.commit()
-            except Exception as e:
-                row.last_tested_at = _utc_now()
-                row.last_test_ok = False
-                row.last_test_message = str(e)[:500]
-                db.commit()
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"GitHub API failed: {e}")
-
-            repo = GithubRepoDetails(
-                id=int(repo_raw.get("id", 0)),
-                full_name=str(repo_raw.get("full_name", "")),
-                private=bool(repo_raw.get("private", False)),
-                html_url=str(repo_raw.get("html_url", "")),
-                description=repo_raw.get("description"),
-                default_branch=repo_raw.get("default_branch"),
-                clone_url=repo_raw.get("clone_url"),
-                ssh_url=repo_raw.get("ssh_url"),
-                language=repo_raw.get("language"),
-                topics=repo_raw.get("topics") if isinstance(repo_raw.get("topics"), list) else None,
-                visibility=repo_raw.get("visibility"),
-                archived=repo_raw.get("archived"),
-                disabled=repo_raw.get("disabled"),
-                fork=repo_raw.get("fork"),
-                stargazers_count=repo_raw.get("stargazers_count"),
-                watchers_count=repo_raw.get("watchers_count"),
-                forks_count=repo_raw.get("forks_count"),
-                open_issues_count=repo_raw.get("open_issues_count"),
-                created_at=repo_raw.get("created_at"),
-                updated_at=repo_raw.get("updated_at"),
-                pushed_at=repo_raw.get("pushed_at"),
-                owner_login=repo_raw.get("owner", {}).get("login") if isinstance(repo_raw.get("owner"), dict) else None,
-            )
-            return GithubRepoDetailsResponse(ok=True, repo=repo)
+        db = self.db
+        row = get_integration(db, user_id=user_id, provider=self.PROVIDER, label=label)
+        if not row or not row.secret_ref:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="GitHub integration not configured")
+
+        store = get_secret_store(db)
+        token = store.get(user_id=user_id, ref=row.secret_ref)
+
+        try:
+            gh = GitHubClient(token)
+            repo_raw = gh.get_repo(repo_full_name)
+            _mark_test_ok(db, row)
+        except Exception as e:
+            row.last_tested_at = _utc_now()
+            row.last_test_ok = False
+            row.last_test_message = str(e)[:500]
+            db.commit()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"GitHub API failed: {e}")
+
+        # trusted: parsed GitHub API response, URL fields are plain str
+        repo = GithubRepoDetails.model_construct(
+            id=int(repo_raw.get("id", 0)),
+            full_name=str(repo_raw.get("full_name", "")),
+            private=bool(repo_raw.get("private", False)),
+            html_url=str(repo_raw.get("html_url", "")),
+            description=repo_raw.get("description"),
+            default_branch=repo_raw.get("default_branch"),
+            clone_url=repo_raw.get("clone_url"),
+            ssh_url=repo_raw.get("ssh_url"),
+            language=repo_raw.get("language"),
+            topics=repo_raw.get("topics") if isinstance(repo_raw.get("topics"), list) else None,
+            visibility=repo_raw.get("visibility"),
+            archived=repo_raw.get("archived"),
+            disabled=repo_raw.get("disabled"),
+            fork=repo_raw.get("fork"),
+            stargazers_count=repo_raw.get("stargazers_count"),
+            watchers_count=repo_raw.get("watchers_count"),
+            forks_count=repo_raw.get("forks_count"),
+            open_issues_count=repo_raw.get("open_issues_count"),
+            created_at=repo_raw.get("created_at"),
+            updated_at=repo_raw.get("updated_at"),
+            pushed_at=repo_raw.get("pushed_at"),
+            owner_login=repo_raw.get("owner", {}).get("login") if isinstance(repo_raw.get("owner"), dict) else None,
+        )
+        return GithubRepoDetailsResponse(ok=True, repo=repo)
@@ -1,70 +1,92 @@
 from __future__ import annotations
 
 from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from base_requests import IntegrationListResponse, IntegrationSummary
-from impl.db.session import SessionLocal
 from impl.db.models import Integration, Secret
+from impl.db.queries import get_integration
 from impl.utils.json_utils import loads
 
 
 class IntegrationService:
+    __slots__ = ("db",)
+
+    # column tuple for the read-only list endpoint: Row tuples skip ORM
+    # hydration and instrumented attribute access entirely
+    _LIST_COLS = (
+        Integration.id,
+        Integration.provider,
+        Integration.label,
+        Integration.config_json,
+        Integration.created_at,
+        Integration.updated_at,
+        Integration.last_tested_at,
+        Integration.last_test_ok,
+        Integration.last_test_message,
+    )
+
+    def __init__(self, db: Session):
+        self.db = db
+
     def list(self, *, user_id: int) -> IntegrationListResponse:
-        with SessionLocal() as db:
-            rows = (
-                db.query(Integration)
-                .filter(Integration.user_id == user_id)
-                .order_by(Integration.provider.asc(), Integration.label.asc())
-                .all()
-            )
+        rows = self.db.execute(
+            select(*self._LIST_COLS)
+            .where(Integration.user_id == user_id)
+            .order_by(Integration.provider.asc(), Integration.label.asc())
+        ).all()
 
-            items = []
-            for r in rows:
+        # hoisted to locals: global/attribute lookups inside the loop are
+        # the remaining per-row cost once ORM hydration is gone
+        construct = IntegrationSummary.model_construct
+        parse = loads
+        items = []
+        append = items.append
+        for rid, provider, label, config_json, created, updated, tested, test_ok, test_msg in rows:
+            try:
+                cfg = parse(config_json)
+            except Exception:
                 cfg = {}
-                try:
-                    cfg = loads(r.config_json)
-                except Exception:
-                    cfg = {}
 
-                items.append(
-                    IntegrationSummary(
-                        id=r.id,
-                        provider=r.provider,
-                        label=r.label,
-                        config=cfg,
-                        created_at=r.created_at.isoformat() if r.created_at else "",
-                        updated_at=r.updated_at.isoformat() if r.updated_at else "",
-                        last_tested_at=r.last_tested_at.isoformat() if getattr(r, "last_tested_at", None) else None,
-                        last_test_ok=bool(r.last_test_ok) if getattr(r, "last_test_ok", None) is not None else None,
-                        last_test_message=getattr(r, "last_test_message", None),
-                    )
+            append(
+                # trusted: DB source
+                construct(
+                    id=rid,
+                    provider=provider,
+                    label=label,
+                    config=cfg,
+                    created_at=created.isoformat() if created else "",
+                    updated_at=updated.isoformat() if updated else "",
+                    last_tested_at=tested.isoformat() if tested else None,
+                    last_test_ok=bool(test_ok) if test_ok is not None else None,
+                    last_test_message=test_msg,
                 )
+            )
 
-            return IntegrationListResponse(ok=True, items=items)
+        return IntegrationListResponse(ok=True, items=items)
 
     def delete(self, *, user_id: int, provider: str, label: str) -> None:
         provider = (provider or "").strip().lower()
         label = (label or "default").strip()
 
-        with SessionLocal() as db:
-            row = (
-                db.query(Integration)
-                .filter(Integration.user_id == user_id, Integration.provider == provider, Integration.label == label)
-                .first()
-            )
-            if not row:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Integration not found")
+        db = self.db
+        row = get_integration(db, user_id=user_id, provider=provider, label=label)
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Integration not found")
 
-            # Best-effort secret cleanup for local sqlite store
-            if row.secret_ref and str(row.secret_ref).startswith("sqlite:"):
-                try:
-                    sid = int(str(row.secret_ref).split(":", 1)[1])
-                    srow = db.query(Secret).filter(Secret.id == sid, Secret.user_id == user_id).first()
-                    if srow:
-                        db.delete(srow)
-                except Exception:
-                    # don't fail deletion because cleanup is messy
-                    pass
+        # Best-effort secret cleanup for local sqlite store
+        if row.secret_ref and str(row.secret_ref).startswith("sqlite:"):
+            try:
+                sid = int(str(row.secret_ref).split(":", 1)[1])
+                srow = db.execute(
+                    select(Secret).where(Secret.id == sid, Secret.user_id == user_id)
+                ).scalar_one_or_none()
+                if srow:
+                    db.delete(srow)
+            except Exception:
+                # don't fail deletion because cleanup is messy
+                pass
 
-            db.delete(row)
-            db.commit()
+        db.delete(row)
+        db.commit()
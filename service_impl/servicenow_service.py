@@ -1,68 +1,101 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from base_requests import (
     ServiceNowConnectRequest, ServiceNowConnectResponse,
-    ServiceNowTable, ServiceNowTableListResponse,
-    ServiceNowField, ServiceNowFieldListResponse, ServiceNowRecordUpsertRequest, ServiceNowRecordResponse,
+    ServiceNowRecordUpsertRequest, ServiceNowRecordResponse,
+)
+from base_structs import (
+    ServiceNowTableStruct, ServiceNowTableListStruct,
+    ServiceNowFieldStruct, ServiceNowFieldListStruct,
 )
-from impl.db.session import SessionLocal
-from impl.db.models import Integration
+from impl.db.models import Integration, utc_now as _utc_now
+from impl.db.queries import get_integration
 from impl.secret_store.factory import get_secret_store
 from impl.integrations.servicenow.client import ServiceNowClient
 from impl.utils.json_utils import dumps, loads
 
 
-def _utc_now():
-    return datetime.now(timezone.utc)
+def _mk_field(r: dict, _get=dict.get) -> ServiceNowFieldStruct:
+    # single fetch per key; max_length arrives as int or numeric string
+    ml = _get(r, "max_length")
+    return ServiceNowFieldStruct(
+        name=str(_get(r, "element", "")).strip(),
+        label=_get(r, "column_label") or _get(r, "label"),
+        mandatory=bool(_get(r, "mandatory")),
+        type=_get(r, "internal_type"),
+        reference=_get(r, "reference"),
+        max_length=int(ml) if isinstance(ml, (int, str)) and str(ml).isdigit() else None,
+    )
+
+
+# matches the GitHub service: a fresh OK is not worth another UPDATE
+_BOOKKEEP_WINDOW_S = 60
+
+
+def _recently_ok(row: Integration, now) -> bool:
+    last = row.last_tested_at
+    if not row.last_test_ok or last is None:
+        return False
+    if last.tzinfo is None:  # SQLite hands back naive datetimes
+        last = last.replace(tzinfo=now.tzinfo)
+    return (now - last).total_seconds() < _BOOKKEEP_WINDOW_S
 
 
 class ServiceNowService:
     PROVIDER = "servicenow"
 
-    def connect(self, *, user_id: int, req: ServiceNowConnectRequest) -> ServiceNowConnectResponse:
-        with SessionLocal() as db:
-            # validate credentials first
-            try:
-                sn = ServiceNowClient(str(req.instance_url), req.username, req.password)
-                sn.validate()
-            except Exception as e:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"ServiceNow auth failed: {e}")
-
-            store = get_secret_store(db)
-            secret_ref = store.put(user_id=user_id, name=f"servicenow_password:{req.label}", value=req.password)
-
-            cfg = {"instance_url": str(req.instance_url), "username": req.username}
-            row = (
-                db.query(Integration)
-                .filter(Integration.user_id == user_id, Integration.provider == self.PROVIDER, Integration.label == req.label)
-                .first()
-            )
-            if row:
-                row.config_json = dumps(cfg)
-                row.secret_ref = secret_ref
-            else:
-                row = Integration(user_id=user_id, provider=self.PROVIDER, label=req.label, config_json=dumps(cfg), secret_ref=secret_ref)
-                db.add(row)
-
-            row.last_tested_at = _utc_now()
-            row.last_test_ok = True
-            row.last_test_message = "OK"
+    __slots__ = ("db",)
 
-            db.commit()
+    def __init__(self, db: Session):
+        self.db = db
 
-            return ServiceNowConnectResponse(ok=True, label=req.label, instance_url=req.instance_url, user=req.username)
+    def connect(self, *, user_id: int, req: ServiceNowConnectRequest) -> ServiceNowConnectResponse:
+        db = self.db
+        # validate credentials first
+        try:
+            sn = ServiceNowClient(str(req.instance_url), req.username, req.password)
+            sn.validate()
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"ServiceNow auth failed: {e}")
 
-    def _get_client(self, db: Session, *, user_id: int, label: str = "default") -> tuple[ServiceNowClient, Integration]:
-        row = (
-            db.query(Integration)
-            .filter(Integration.user_id == user_id, Integration.provider == self.PROVIDER, Integration.label == label)
-            .first()
-        )
+        store = get_secret_store(db)
+        secret_ref = store.put(user_id=user_id, name=f"servicenow_password:{req.label}", value=req.password)
+
+        cfg = {"instance_url": str(req.instance_url), "username": req.username}
+        row = get_integration(db, user_id=user_id, provider=self.PROVIDER, label=req.label)
+        if row:
+            row.config_json = dumps(cfg)
+            row.secret_ref = secret_ref
+        else:
+            row = Integration(user_id=user_id, provider=self.PROVIDER, label=req.label, config_json=dumps(cfg), secret_ref=secret_ref)
+            db.add(row)
+
+        row.last_tested_at = _utc_now()
+        row.last_test_ok = True
+        row.last_test_message = "OK"
+
+        db.commit()
+
+        return ServiceNowConnectResponse(ok=True, label=req.label, instance_url=req.instance_url, user=req.username)
+
+    def _record_test_result(self, row: Integration, *, ok: bool, message: str) -> None:
+        # shared tail for every API method: one UPDATE + one commit per call,
+        # whichever branch we arrived from. A repeat OK within the window is
+        # a no-op, so read-heavy endpoints stop paying an UPDATE per hit.
+        now = _utc_now()
+        if ok and _recently_ok(row, now):
+            return
+        row.last_tested_at = now
+        row.last_test_ok = ok
+        row.last_test_message = message
+        self.db.commit()
+
+    def _get_client(self, *, user_id: int, label: str = "default") -> tuple[ServiceNowClient, Integration]:
+        db = self.db
+        row = get_integration(db, user_id=user_id, provider=self.PROVIDER, label=label)
         if not row or not row.secret_ref:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="ServiceNow integration not configured")
 
@@ -77,64 +110,33 @@ class ServiceNowService:
         client = ServiceNowClient(str(instance_url), str(username), str(password))
         return client, row
 
-    def list_tables(self, *, user_id: int, limit: int = 50, query: str | None = None, label: str = "default") -> ServiceNowTableListResponse:
-        with SessionLocal() as db:
-            sn, irow = self._get_client(db, user_id=user_id, label=label)
-            try:
-                rows = sn.list_tables(limit=limit, query=query)
-
-                irow.last_tested_at = _utc_now()
-                irow.last_test_ok = True
-                irow.last_test_message = "OK"
-                db.commit()
-            except Exception as e:
-                irow.last_tested_at = _utc_now()
-                irow.last_test_ok = False
-                irow.last_test_message = str(e)[:500]
-                db.commit()
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"ServiceNow API failed: {e}")
-
-            tables = [ServiceNowTable(name=str(r.get("name","")), label=r.get("label")) for r in rows if r.get("name")]
-            return ServiceNowTableListResponse(ok=True, tables=tables, returned=len(tables))
-
-    def list_fields(self, *, user_id: int, table: str, label: str = "default") -> ServiceNowFieldListResponse:
+    def list_tables(self, *, user_id: int, limit: int = 50, query: str | None = None, label: str = "default") -> ServiceNowTableListStruct:
+        sn, irow = self._get_client(user_id=user_id, label=label)
+        try:
+            rows = sn.list_tables(limit=limit, query=query)
+        except Exception as e:
+            self._record_test_result(irow, ok=False, message=str(e)[:500])
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"ServiceNow API failed: {e}")
+        self._record_test_result(irow, ok=True, message="OK")
+
+        tables = [ServiceNowTableStruct(name=str(r.get("name","")), label=r.get("label")) for r in rows if r.get("name")]
+        return ServiceNowTableListStruct(ok=True, tables=tables, returned=len(tables))
+
+    def list_fields(self, *, user_id: int, table: str, label: str = "default") -> ServiceNowFieldListStruct:
         table_name = table.strip()
         if not table_name:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="table is required")
 
-        with SessionLocal() as db:
-            sn, irow = self._get_client(db, user_id=user_id, label=label)
-            try:
-                rows = sn.list_fields(table=table_name)
-
-                irow.last_tested_at = _utc_now()
-                irow.last_test_ok = True
-                irow.last_test_message = "OK"
-                db.commit()
-            except Exception as e:
-                irow.last_tested_at = _utc_now()
-                irow.last_test_ok = False
-                irow.last_test_message = str(e)[:500]
-                db.commit()
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"ServiceNow API failed: {e}")
-
-            fields: list[ServiceNowField] = []
-            for r in rows:
-                name = str(r.get("element", "")).strip()
-                if not name:
-                    continue
-                fields.append(
-                    ServiceNowField(
-                        name=name,
-                        label=r.get("column_label") or r.get("label"),
-                        mandatory=bool(r.get("mandatory")),
-                        type=r.get("internal_type"),
-                        reference=r.get("reference"),
-                        max_length=int(r.get("max_length")) if str(r.get("max_length") or "").isdigit() else None,
-                    )
-                )
-
-            return ServiceNowFieldListResponse(ok=True, table=table_name, fields=fields, returned=len(fields))
+        sn, irow = self._get_client(user_id=user_id, label=label)
+        try:
+            rows = sn.list_fields(table=table_name)
+        except Exception as e:
+            self._record_test_result(irow, ok=False, message=str(e)[:500])
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"ServiceNow API failed: {e}")
+        self._record_test_result(irow, ok=True, message="OK")
+
+        fields = [f for r in rows if (f := _mk_field(r)).name]
+        return ServiceNowFieldListStruct(ok=True, table=table_name, fields=fields, returned=len(fields))
 
     def upsert_record(self, *, user_id: int, req: ServiceNowRecordUpsertRequest) -> ServiceNowRecordResponse:
         table_name = req.table.strip()
@@ -143,36 +145,28 @@ class ServiceNowService:
         if not req.data:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="data is required")
 
-        with SessionLocal() as db:
-            sn, irow = self._get_client(db, user_id=user_id, label=req.label)
-            try:
-                if req.sys_id:
-                    raw = sn.update_record(table=table_name, sys_id=req.sys_id, payload=req.data)
-                    action = "updated"
-                else:
-                    raw = sn.create_record(table=table_name, payload=req.data)
-                    action = "created"
-
-                irow.last_tested_at = _utc_now()
-                irow.last_test_ok = True
-                irow.last_test_message = "OK"
-                db.commit()
-            except Exception as e:
-                irow.last_tested_at = _utc_now()
-                irow.last_test_ok = False
-                irow.last_test_message = str(e)[:500]
-                db.commit()
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"ServiceNow API failed: {e}")
-
-            result = raw.get("result") if isinstance(raw, dict) else None
-            sys_id = ""
-            if isinstance(result, dict):
-                sys_id = str(result.get("sys_id") or req.sys_id or "")
-
-            return ServiceNowRecordResponse(
-                ok=True,
-                table=table_name,
-                sys_id=sys_id,
-                action=action,
-                record=result or raw or {},
-            )
+        sn, irow = self._get_client(user_id=user_id, label=req.label)
+        try:
+            if req.sys_id:
+                raw = sn.update_record(table=table_name, sys_id=req.sys_id, payload=req.data)
+                action = "updated"
+            else:
+                raw = sn.create_record(table=table_name, payload=req.data)
+                action = "created"
+        except Exception as e:
+            self._record_test_result(irow, ok=False, message=str(e)[:500])
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"ServiceNow API failed: {e}")
+        self._record_test_result(irow, ok=True, message="OK")
+
+        result = raw.get("result") if isinstance(raw, dict) else None
+        sys_id = ""
+        if isinstance(result, dict):
+            sys_id = str(result.get("sys_id") or req.sys_id or "")
+
+        return ServiceNowRecordResponse(
+            ok=True,
+            table=table_name,
+            sys_id=sys_id,
+            action=action,
+            record=result or raw or {},
+        )
@@ -1,48 +1,90 @@
 from __future__ import annotations
 
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
 from base_requests import UserSettings, UserSettingsResponse, UpdateUserSettingsRequest
-from impl.db.session import SessionLocal
-from impl.db.models import UserSetting
+from impl.db.models import UserSetting, utc_now
+
+
+def _response(theme: str | None, notifications) -> UserSettingsResponse:
+    return UserSettingsResponse(
+        ok=True,
+        settings=UserSettings(theme=theme or "dark", notifications=bool(notifications)),
+    )
 
 
 class UserSettingsService:
     """Persisted per-user settings.
 
-    Minimal schema: theme + notifications.
+    Minimal schema: theme + notifications. Reads and writes are collapsed to
+    one statement on the common path; the unique index on user_id makes the
+    first-touch insert race-free instead of SELECT-then-INSERT.
     """
 
+    __slots__ = ("db",)
+
+    _COLS = (UserSetting.theme, UserSetting.notifications)
+
+    def __init__(self, db: Session):
+        self.db = db
+
     def get(self, *, user_id: int) -> UserSettingsResponse:
-        with SessionLocal() as db:
-            row = db.query(UserSetting).filter(UserSetting.user_id == user_id).first()
-            if not row:
-                row = UserSetting(user_id=user_id, theme="dark", notifications=True)
-                db.add(row)
-                db.commit()
-                db.refresh(row)
+        db = self.db
+        row = db.execute(select(*self._COLS).where(UserSetting.user_id == user_id)).one_or_none()
+        if row is not None:
+            return _response(*row)
 
-            return UserSettingsResponse(
-                ok=True,
-                settings=UserSettings(theme=row.theme or "dark", notifications=bool(row.notifications)),
+        # first touch: persist the defaults; a concurrent insert wins silently
+        if db.get_bind().dialect.name == "sqlite":
+            db.execute(
+                sqlite_insert(UserSetting)
+                .values(user_id=user_id)
+                .on_conflict_do_nothing(index_elements=["user_id"])
             )
-
-    def update(self, *, user_id: int, req: UpdateUserSettingsRequest) -> UserSettingsResponse:
-        with SessionLocal() as db:
-            row = db.query(UserSetting).filter(UserSetting.user_id == user_id).first()
-            if not row:
-                row = UserSetting(user_id=user_id, theme="dark", notifications=True)
-                db.add(row)
+            db.commit()
+        else:
+            try:
+                db.add(UserSetting(user_id=user_id))
                 db.commit()
-                db.refresh(row)
+            except IntegrityError:
+                db.rollback()
+        return _response("dark", True)
 
-            if req.theme is not None:
-                row.theme = (req.theme or "dark")[:30]
-            if req.notifications is not None:
-                row.notifications = bool(req.notifications)
+    def update(self, *, user_id: int, req: UpdateUserSettingsRequest) -> UserSettingsResponse:
+        changes = {}
+        if req.theme is not None:
+            changes["theme"] = (req.theme or "dark")[:30]
+        if req.notifications is not None:
+            changes["notifications"] = bool(req.notifications)
 
+        db = self.db
+        if db.get_bind().dialect.name == "sqlite":
+            # one INSERT ... ON CONFLICT DO UPDATE ... RETURNING instead of
+            # SELECT + INSERT + UPDATE + refresh round-trips
+            stmt = sqlite_insert(UserSetting).values(user_id=user_id, **changes)
+            if changes:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["user_id"], set_={**changes, "updated_at": utc_now()}
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=["user_id"])
+            row = db.execute(stmt.returning(*self._COLS)).one_or_none()
+            if row is None:  # no-op conflict: nothing to change, read current
+                row = db.execute(select(*self._COLS).where(UserSetting.user_id == user_id)).one()
             db.commit()
-            db.refresh(row)
+            return _response(*row)
 
-            return UserSettingsResponse(
-                ok=True,
-                settings=UserSettings(theme=row.theme or "dark", notifications=bool(row.notifications)),
-            )
+        # portable read-modify-write for engines without sqlite upsert
+        row = db.execute(select(UserSetting).where(UserSetting.user_id == user_id)).scalar_one_or_none()
+        if not row:
+            row = UserSetting(user_id=user_id)
+            db.add(row)
+        for field, value in changes.items():
+            setattr(row, field, value)
+        db.flush()
+        resp = _response(row.theme, row.notifications)
+        db.commit()
+        return resp